@@ -1,31 +1,43 @@
 """CLI module for cursor-dev-rules."""
 
+import contextlib
+import functools
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from importlib import resources
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
-from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
-console = Console()
+if TYPE_CHECKING:
+    from rich.console import Console
 
+# Chunk size used when streaming rule files that are not on the filesystem
+COPY_BUFSIZE = 1024 * 1024
 
+# Where fetch installs the rules, relative to the current working directory
+GENERAL_RULE_DEST = ".cursor/rules/general/RULE.md"
+SPECIFIC_RULE_DEST = ".cursor/rules/code-patterns/RULE.md"
+
+# Suffix of the files fetch copies into before moving them into place
+STAGED_SUFFIX = ".staged"
+
+
+@functools.lru_cache(maxsize=1)
 def get_rules_path():
     """Get the path to the bundled rules directory.
 
     Returns either a Traversable (from importlib.resources) or a Path.
+    The lookup is memoized, so the package resolution and filesystem
+    probes only run once per process.
     """
-    import importlib.resources
-
     try:
         # Try to get the rules from the installed package
-        package_ref = importlib.resources.files("cursor_dev_rules")
-        rules_ref = package_ref / "rules"
-        # Check if it's a directory (Traversable) or exists as a path
-        if hasattr(rules_ref, "is_dir") and rules_ref.is_dir():
-            return rules_ref
-        elif isinstance(rules_ref, Path) and rules_ref.exists() and rules_ref.is_dir():
+        rules_ref = resources.files("cursor_dev_rules") / "rules"
+        # Traversable and Path both expose is_dir()
+        if rules_ref.is_dir():
             return rules_ref
     except (ModuleNotFoundError, AttributeError, TypeError):
         # Log the exception for debugging, but continue to fallback
@@ -34,48 +46,101 @@ def get_rules_path():
         # Catch any other exceptions and continue to fallback
         pass
 
-    # Fallback: look for rules in the package directory (for development/editable installs)
+    # Fallback: look for rules in the package directory (for development/editable
+    # installs), then in the project root (for development)
     package_dir = Path(__file__).parent
-    rules_path = package_dir / "rules"
-    if rules_path.exists() and rules_path.is_dir():
-        return rules_path
-
-    # Additional fallback: look for rules in the project root (for development)
-    project_root = Path(__file__).parent.parent
-    rules_path = project_root / "rules"
-    if rules_path.exists() and rules_path.is_dir():
-        return rules_path
+    for rules_path in (package_dir / "rules", package_dir.parent / "rules"):
+        if rules_path.is_dir():
+            return rules_path
 
     raise FileNotFoundError("Could not find rules directory")
 
 
-def copy_rule_file(source, dest: Path, console: Console) -> bool:
+@functools.lru_cache(maxsize=32)
+def _resolve_rule_sources(rules_path, category: str, framework: str):
+    """Locate the general and framework rule files for ``category/framework``.
+
+    Returns ``(general, general_exists, specific, specific_exists)``. Lookups,
+    including misses, are memoized per process so repeated requests for the
+    same (possibly mistyped) rule path skip the filesystem probes.
+    """
+    general = rules_path.joinpath(category, "general", "RULE.md")
+    specific = rules_path.joinpath(category, framework, "RULE.md")
+    # Both Traversable (from importlib.resources) and Path objects
+    # expose is_file(), which is False for missing paths
+    return general, general.is_file(), specific, specific.is_file()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_console() -> "Console":
+    """Get the shared Rich console.
+
+    Rich is imported lazily so that ``--help`` and ``--version`` don't pay
+    for importing it.
+    """
+    from rich.console import Console
+
+    return Console()
+
+
+def copy_rule_file(
+    source, dest: Path, console: "Console", make_parents: bool = True
+) -> bool:
     """Copy a rule file from source to destination.
 
     Source can be either a Traversable (from importlib.resources) or a Path.
+    Pass ``make_parents=False`` when the destination directory is known to
+    exist already. The rule is written to a temporary file next to ``dest``
+    and then renamed into place, so an interrupted copy never leaves a
+    truncated rule behind.
     """
+    tmp = os.fspath(dest) + ".tmp"
     try:
-        dest.parent.mkdir(parents=True, exist_ok=True)
-
-        # Use importlib.resources if source is a Traversable
-        if hasattr(source, "read_bytes"):
-            # It's a Traversable from importlib.resources
-            content = source.read_bytes()
-            dest.write_bytes(content)
-        elif isinstance(source, Path):
-            # It's a regular Path
-            shutil.copy2(source, dest)
+        if make_parents:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+
+        if isinstance(source, (str, Path)):
+            # Filesystem paths take shutil's zero-copy fast path (sendfile etc.)
+            shutil.copy2(source, tmp)
         else:
-            # Try to read as bytes
-            content = source.read_bytes()
-            dest.write_bytes(content)
+            # Stream Traversables (from importlib.resources) instead of
+            # loading the whole file into memory
+            with source.open("rb") as src, open(tmp, "wb") as dst:
+                shutil.copyfileobj(src, dst, COPY_BUFSIZE)
 
+        os.replace(tmp, dest)
         return True
     except Exception as e:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
         console.print(f"[red]Error copying file to {dest}: {e}[/red]")
         return False
 
 
+class RulePath(click.ParamType):
+    """A ``category/framework`` rule path, converted to a tuple.
+
+    Validating at parse time rejects malformed paths before any rule lookup
+    or Rich rendering happens.
+    """
+
+    name = "category/framework"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, tuple):
+            return value
+        # Count separators before splitting, so malformed input never allocates
+        if value.count("/") != 1:
+            self.fail(
+                "Invalid rule path format. Expected format: category/framework "
+                "(e.g. backend/django, backend/fastapi, frontend/nextjs).",
+                param,
+                ctx,
+            )
+        category, framework = value.split("/", 1)
+        return category, framework
+
+
 @click.group()
 @click.version_option(version="0.1.0")
 def main():
@@ -84,127 +149,98 @@ def main():
 
 
 @main.command()
-@click.argument("rule_path", type=str)
-def fetch(rule_path: str):
+@click.argument("rule_path", type=RulePath())
+def fetch(rule_path: tuple[str, str]):
     """Fetch rules for a specific framework.
 
     RULE_PATH should be in the format: category/framework
     Examples: backend/django, backend/fastapi, frontend/nextjs
     """
+    from rich.panel import Panel
+
+    console = _get_console()
+
+    category, framework = rule_path
+
     try:
-        # Parse the rule path
-        parts = rule_path.split("/")
-        if len(parts) != 2:
+        cwd = Path.cwd()
+
+        (
+            general_rule_source,
+            general_exists,
+            specific_rule_source,
+            specific_exists,
+        ) = _resolve_rule_sources(get_rules_path(), category, framework)
+
+        if not general_exists:
             console.print(
                 Panel(
-                    "[red]Invalid rule path format.[/red]\n\n"
-                    "Expected format: [bold]category/framework[/bold]\n"
-                    "Examples:\n"
-                    "  • backend/django\n"
-                    "  • backend/fastapi\n"
-                    "  • frontend/nextjs",
+                    f"[red]General rule not found:[/red] {general_rule_source}\n\n"
+                    f"Available categories: backend, frontend",
                     title="[red]Error[/red]",
                     border_style="red",
                 )
             )
             raise click.Abort()
 
-        category, framework = parts
-
-        # Get the current working directory
-        cwd = Path.cwd()
-        cursor_rules_dir = cwd / ".cursor" / "rules"
-
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
-            # Task 1: Validate and locate rules
-            task1 = progress.add_task("Locating rules...", total=None)
-
-            rules_path = get_rules_path()
-            general_rule_source = rules_path / category / "general" / "RULE.md"
-            specific_rule_source = rules_path / category / framework / "RULE.md"
-
-            # Check if rules exist
-            # Handle both Traversable (from importlib.resources) and Path objects
-            general_exists = False
-            specific_exists = False
-
-            if hasattr(general_rule_source, "is_file"):
-                # Traversable from importlib.resources
-                general_exists = general_rule_source.is_file()
-            elif isinstance(general_rule_source, Path):
-                # Regular Path object
-                general_exists = (
-                    general_rule_source.exists() and general_rule_source.is_file()
-                )
-
-            if hasattr(specific_rule_source, "is_file"):
-                # Traversable from importlib.resources
-                specific_exists = specific_rule_source.is_file()
-            elif isinstance(specific_rule_source, Path):
-                # Regular Path object
-                specific_exists = (
-                    specific_rule_source.exists() and specific_rule_source.is_file()
+        if not specific_exists:
+            console.print(
+                Panel(
+                    f"[red]Framework rule not found:[/red] {specific_rule_source}\n\n"
+                    f"Available frameworks for [bold]{category}[/bold]:\n"
+                    f"  • Check the cursor_dev_rules/rules/{category}/ directory",
+                    title="[red]Error[/red]",
+                    border_style="red",
                 )
+            )
+            raise click.Abort()
 
-            if not general_exists:
-                console.print(
-                    Panel(
-                        f"[red]General rule not found:[/red] {general_rule_source}\n\n"
-                        f"Available categories: backend, frontend",
-                        title="[red]Error[/red]",
-                        border_style="red",
-                    )
-                )
-                raise click.Abort()
-
-            if not specific_exists:
-                console.print(
-                    Panel(
-                        f"[red]Framework rule not found:[/red] {specific_rule_source}\n\n"
-                        f"Available frameworks for [bold]{category}[/bold]:\n"
-                        f"  • Check the cursor_dev_rules/rules/{category}/ directory",
-                        title="[red]Error[/red]",
-                        border_style="red",
-                    )
+        # Copy both rules concurrently, they are independent files
+        copies = [
+            ("general", general_rule_source, GENERAL_RULE_DEST),
+            (framework, specific_rule_source, SPECIFIC_RULE_DEST),
+        ]
+
+        # Create each destination directory once, up front
+        for _, _, dest_rel in copies:
+            (cwd / dest_rel).parent.mkdir(parents=True, exist_ok=True)
+
+        # Stage both copies next to their destinations and only move them into
+        # place once both succeeded, so a failed copy never leaves a half install
+        with ThreadPoolExecutor(max_workers=len(copies)) as executor:
+            futures = [
+                executor.submit(
+                    copy_rule_file,
+                    source,
+                    cwd / (dest_rel + STAGED_SUFFIX),
+                    console,
+                    make_parents=False,
                 )
-                raise click.Abort()
-
-            progress.update(task1, completed=True)
+                for _, source, dest_rel in copies
+            ]
+        copied = [future.result() for future in futures]
+
+        if not all(copied):
+            for _, _, dest_rel in copies:
+                with contextlib.suppress(OSError):
+                    os.remove(cwd / (dest_rel + STAGED_SUFFIX))
+            raise click.Abort()
 
-            # Task 2: Copy general rule
-            task2 = progress.add_task("Copying general rule...", total=None)
-            general_dest = cursor_rules_dir / "general" / "RULE.md"
-            if copy_rule_file(general_rule_source, general_dest, console):
-                progress.update(task2, completed=True)
-                console.print(
-                    f"[green]✓[/green] Copied general rule to [bold]{general_dest.relative_to(cwd)}[/bold]"
-                )
-            else:
-                raise click.Abort()
-
-            # Task 3: Copy specific rule
-            task3 = progress.add_task(f"Copying {framework} rule...", total=None)
-            specific_dest = cursor_rules_dir / "code-patterns" / "RULE.md"
-            if copy_rule_file(specific_rule_source, specific_dest, console):
-                progress.update(task3, completed=True)
-                console.print(
-                    f"[green]✓[/green] Copied {framework} rule to [bold]{specific_dest.relative_to(cwd)}[/bold]"
-                )
-            else:
-                raise click.Abort()
+        # Report in submission order so the output is deterministic
+        for label, _, dest_rel in copies:
+            os.replace(cwd / (dest_rel + STAGED_SUFFIX), cwd / dest_rel)
+            console.print(
+                f"[green]✓[/green] Copied {label} rule to [bold]{dest_rel}[/bold]"
+            )
 
         # Success message
         console.print()
         console.print(
             Panel(
-                f"[green]Successfully installed rules for [bold]{rule_path}[/bold]![/green]\n\n"
+                f"[green]Successfully installed rules for [bold]{category}/{framework}[/bold]![/green]\n\n"
                 f"Rules are now available at:\n"
-                f"  • {cursor_rules_dir.relative_to(cwd) / 'general' / 'RULE.md'}\n"
-                f"  • {cursor_rules_dir.relative_to(cwd) / 'code-patterns' / 'RULE.md'}",
+                f"  • {GENERAL_RULE_DEST}\n"
+                f"  • {SPECIFIC_RULE_DEST}",
                 title="[green]Success[/green]",
                 border_style="green",
             )
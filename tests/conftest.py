@@ -1,24 +1,64 @@
 """Pytest configuration and fixtures."""
 
-import tempfile
-from pathlib import Path
+import io
+import zipfile
 from unittest.mock import MagicMock
 
 import pytest
+from click.testing import CliRunner
+from rich.console import Console
 
+from cursor_dev_rules.cli import _resolve_rule_sources, get_rules_path
+
+
+@pytest.fixture(autouse=True)
+def clear_rules_path_cache():
+    """Reset the memoized rule lookups so each test resolves them afresh."""
+    get_rules_path.cache_clear()
+    _resolve_rule_sources.cache_clear()
+    yield
+    get_rules_path.cache_clear()
+    _resolve_rule_sources.cache_clear()
 
-@pytest.fixture
-def temp_dir():
-    """Create a temporary directory for testing."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yield Path(tmpdir)
+
+@pytest.fixture(scope="module")
+def module_tmp_dir(request, tmp_path_factory):
+    """Create one temporary directory shared by all tests in a module."""
+    return tmp_path_factory.mktemp(request.module.__name__, numbered=False)
 
 
 @pytest.fixture
-def mock_rules_dir(temp_dir):
-    """Create a mock rules directory structure."""
-    rules_dir = temp_dir / "rules"
-    rules_dir.mkdir(parents=True)
+def temp_dir(module_tmp_dir, request):
+    """Create an empty temporary directory for a single test."""
+    path = module_tmp_dir / request.node.name
+    path.mkdir()
+    return path
+
+
+@pytest.fixture(scope="session")
+def runner():
+    """Create a CLI runner shared by the whole test session."""
+    return CliRunner()
+
+
+@pytest.fixture(scope="session")
+def console():
+    """Create a Rich console shared by the whole test session.
+
+    Writing to a StringIO without colors skips terminal and color detection.
+    """
+    return Console(file=io.StringIO(), force_terminal=False, no_color=True)
+
+
+@pytest.fixture(scope="session")
+def mock_rules_dir(tmp_path_factory):
+    """Create a mock rules directory structure.
+
+    The directory is shared by the whole test session, so tests must not
+    modify it.
+    """
+    rules_dir = tmp_path_factory.mktemp("package") / "rules"
+    rules_dir.mkdir()
 
     # Create backend rules
     (rules_dir / "backend" / "general").mkdir(parents=True)
@@ -41,6 +81,19 @@ def mock_rules_dir(temp_dir):
     return rules_dir
 
 
+@pytest.fixture(scope="session")
+def mock_zip_rules(mock_rules_dir, tmp_path_factory):
+    """Create a zip-backed Traversable of the mock rules directory.
+
+    This mirrors what importlib.resources returns for zip-imported packages.
+    """
+    zip_path = tmp_path_factory.mktemp("zipped") / "package.zip"
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        for rule in mock_rules_dir.rglob("RULE.md"):
+            archive.write(rule, rule.relative_to(mock_rules_dir.parent).as_posix())
+    return zipfile.Path(zip_path, "rules/")
+
+
 @pytest.fixture
 def mock_traversable():
     """Create a mock Traversable object from importlib.resources."""
@@ -48,48 +101,23 @@ def mock_traversable():
     mock.is_dir.return_value = True
     mock.is_file.return_value = True
     mock.read_bytes.return_value = b"# Mock Rule Content"
+    mock.open.side_effect = lambda *args, **kwargs: io.BytesIO(b"# Mock Rule Content")
     return mock
 
 
 @pytest.fixture
-def mock_package_resources(mock_rules_dir, mock_traversable):
-    """Mock importlib.resources to return our test rules directory."""
+def mock_package_resources(mock_rules_dir, monkeypatch):
+    """Point importlib.resources at our test rules directory.
+
+    importlib.resources.files() returns a plain Path for packages installed
+    on the filesystem, so the real rules directory stands in for it.
+    """
+    package_dir = mock_rules_dir.parent
 
     def mock_files(package_name):
         if package_name == "cursor_dev_rules":
-            mock_package = MagicMock()
-            mock_rules = MagicMock()
-            mock_rules.is_dir.return_value = True
-
-            # Mock the general rule
-            mock_general = MagicMock()
-            mock_general.is_file.return_value = True
-            mock_general.read_bytes.return_value = b"# Backend General Rule"
-
-            # Mock the specific rule
-            mock_specific = MagicMock()
-            mock_specific.is_file.return_value = True
-            mock_specific.read_bytes.return_value = b"# Django Rule"
-
-            # Set up the path structure
-            def mock_div(name):
-                if name == "rules":
-                    return mock_rules
-                elif name == "backend":
-                    mock_backend = MagicMock()
-                    mock_backend.__truediv__ = (
-                        lambda x: mock_general
-                        if x == "general/RULE.md"
-                        else mock_specific
-                    )
-                    return mock_backend
-                return MagicMock()
-
-            mock_rules.__truediv__ = mock_div
-            mock_package.__truediv__ = (
-                lambda x: mock_rules if x == "rules" else MagicMock()
-            )
-            return mock_package
-        return MagicMock()
-
-    return mock_files
+            return package_dir
+        raise ModuleNotFoundError(package_name)
+
+    monkeypatch.setattr("cursor_dev_rules.cli.resources.files", mock_files)
+    return mock_rules_dir
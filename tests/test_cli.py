@@ -1,22 +1,18 @@
 """Tests for CLI commands in cursor_dev_rules.cli."""
 
+import subprocess
+import sys
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
-from click.testing import CliRunner
 
-from cursor_dev_rules.cli import main
+from cursor_dev_rules.cli import _resolve_rule_sources, copy_rule_file, main
 
 
 class TestFetchCommand:
     """Tests for the fetch CLI command."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create a CLI runner for testing."""
-        return CliRunner()
-
     @pytest.fixture
     def mock_rules_path(self, mock_rules_dir):
         """Mock get_rules_path to return our test rules directory."""
@@ -31,6 +27,9 @@ class TestFetchCommand:
                 assert result.exit_code == 0
                 assert "Successfully installed rules" in result.output
                 assert "backend/django" in result.output
+                assert result.output.index("Copied general rule") < (
+                    result.output.index("Copied django rule")
+                )
 
                 # Check that files were copied
                 general_rule = Path(".cursor/rules/general/RULE.md")
@@ -98,6 +97,15 @@ class TestFetchCommand:
         assert result.exit_code != 0
         assert "Invalid rule path format" in result.output
 
+    def test_fetch_invalid_path_is_usage_error(self, runner):
+        """Test fetch rejects invalid paths as a usage error at parse time."""
+        with patch("cursor_dev_rules.cli.get_rules_path") as mock_get_rules_path:
+            result = runner.invoke(main, ["fetch", "backend"])
+
+        assert result.exit_code == 2
+        assert "Usage:" in result.output
+        mock_get_rules_path.assert_not_called()
+
     def test_fetch_nonexistent_category(self, runner, mock_rules_path, temp_dir):
         """Test fetch with non-existent category."""
         with patch("cursor_dev_rules.cli.get_rules_path", return_value=mock_rules_path):
@@ -116,6 +124,47 @@ class TestFetchCommand:
                 assert result.exit_code != 0
                 assert "Framework rule not found" in result.output
 
+    def test_fetch_caches_missing_rule_lookup(self, runner, mock_rules_path, temp_dir):
+        """Test repeated fetches of a missing rule only resolve it once."""
+        with patch("cursor_dev_rules.cli.get_rules_path", return_value=mock_rules_path):
+            with runner.isolated_filesystem(temp_dir):
+                for _ in range(3):
+                    result = runner.invoke(main, ["fetch", "backend/nonexistent"])
+                    assert result.exit_code != 0
+                    assert "Framework rule not found" in result.output
+
+        cache_info = _resolve_rule_sources.cache_info()
+        assert cache_info.misses == 1
+        assert cache_info.hits == 2
+
+    def test_fetch_framework_case_follows_filesystem(
+        self, runner, mock_rules_path, temp_dir
+    ):
+        """Test a differently cased framework resolves as the filesystem does."""
+        case_insensitive_fs = (mock_rules_path / "backend" / "DJANGO").is_dir()
+
+        with patch("cursor_dev_rules.cli.get_rules_path", return_value=mock_rules_path):
+            with runner.isolated_filesystem(temp_dir):
+                result = runner.invoke(main, ["fetch", "backend/Django"])
+
+                if case_insensitive_fs:
+                    assert result.exit_code == 0
+                    assert Path(".cursor/rules/code-patterns/RULE.md").read_text() == (
+                        "# Django Rule"
+                    )
+                else:
+                    assert result.exit_code != 0
+                    assert "Framework rule not found" in result.output
+
+    def test_fetch_empty_framework(self, runner, mock_rules_path, temp_dir):
+        """Test fetch with an empty framework name."""
+        with patch("cursor_dev_rules.cli.get_rules_path", return_value=mock_rules_path):
+            with runner.isolated_filesystem(temp_dir):
+                result = runner.invoke(main, ["fetch", "backend/"])
+
+                assert result.exit_code != 0
+                assert "Framework rule not found" in result.output
+
     def test_fetch_missing_general_rule(self, runner, temp_dir):
         """Test fetch when general rule is missing."""
         # Create a rules directory without general rule
@@ -216,33 +265,54 @@ class TestFetchCommand:
                 assert "Could not find rules directory" in result.output
                 assert "Make sure the package is properly installed" in result.output
 
-    def test_fetch_with_traversable_source(self, runner, mock_traversable, temp_dir):
-        """Test fetch with Traversable source from importlib.resources."""
-        # This test verifies that the fetch command works with Path objects
-        # (which is what get_rules_path returns in dev mode).
-        # Testing with actual Traversable objects would require installing
-        # the package, which is tested in integration tests.
-        # For unit tests, we verify the Path-based flow works correctly.
-        mock_rules_path = temp_dir / "rules"
-        (mock_rules_path / "backend" / "general").mkdir(parents=True)
-        (mock_rules_path / "backend" / "django").mkdir(parents=True)
-        (mock_rules_path / "backend" / "general" / "RULE.md").write_text(
-            "# Backend General Rule"
-        )
-        (mock_rules_path / "backend" / "django" / "RULE.md").write_text("# Django Rule")
-
-        with patch("cursor_dev_rules.cli.get_rules_path", return_value=mock_rules_path):
+    def test_fetch_with_package_resources(
+        self, runner, mock_package_resources, temp_dir
+    ):
+        """Test fetch with rules resolved through importlib.resources."""
+        with runner.isolated_filesystem(temp_dir):
+            result = runner.invoke(main, ["fetch", "backend/django"])
+
+            assert result.exit_code == 0
+            assert "Successfully installed rules" in result.output
+
+            # Verify files were copied
+            general_rule = Path(".cursor/rules/general/RULE.md")
+            specific_rule = Path(".cursor/rules/code-patterns/RULE.md")
+            assert general_rule.read_text() == "# Backend General Rule"
+            assert specific_rule.read_text() == "# Django Rule"
+
+    def test_fetch_with_zip_traversable_source(self, runner, mock_zip_rules, temp_dir):
+        """Test fetch with zip-backed Traversable sources."""
+        with patch("cursor_dev_rules.cli.get_rules_path", return_value=mock_zip_rules):
             with runner.isolated_filesystem(temp_dir):
                 result = runner.invoke(main, ["fetch", "backend/django"])
 
                 assert result.exit_code == 0
                 assert "Successfully installed rules" in result.output
 
-                # Verify files were copied
                 general_rule = Path(".cursor/rules/general/RULE.md")
                 specific_rule = Path(".cursor/rules/code-patterns/RULE.md")
-                assert general_rule.exists()
-                assert specific_rule.exists()
+                assert general_rule.read_text() == "# Backend General Rule"
+                assert specific_rule.read_text() == "# Django Rule"
+
+    @pytest.mark.parametrize(
+        "rule_path, message",
+        [
+            ("backend/nonexistent", "Framework rule not found"),
+            ("nonexistent/framework", "General rule not found"),
+        ],
+        ids=["missing_framework", "missing_category"],
+    )
+    def test_fetch_zip_traversable_missing_rule(
+        self, runner, mock_zip_rules, temp_dir, rule_path, message
+    ):
+        """Test fetch reports missing rules in zip-backed Traversables."""
+        with patch("cursor_dev_rules.cli.get_rules_path", return_value=mock_zip_rules):
+            with runner.isolated_filesystem(temp_dir):
+                result = runner.invoke(main, ["fetch", rule_path])
+
+                assert result.exit_code != 0
+                assert message in result.output
 
     def test_fetch_special_characters_in_path(self, runner, mock_rules_path, temp_dir):
         """Test fetch handles special characters in paths correctly."""
@@ -272,6 +342,23 @@ class TestFetchCommand:
         assert "Cursor Dev Rules" in result.output
         assert "fetch" in result.output
 
+    def test_version_and_help_skip_rich_import(self):
+        """Test --version, --help and invalid rule paths don't import Rich."""
+        code = (
+            "import sys\n"
+            "from click.testing import CliRunner\n"
+            "from cursor_dev_rules.cli import main\n"
+            "CliRunner().invoke(main, ['--version'])\n"
+            "CliRunner().invoke(main, ['--help'])\n"
+            "CliRunner().invoke(main, ['fetch', 'django'])\n"
+            "assert not any(m.startswith('rich') for m in sys.modules)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+
+        assert result.returncode == 0, result.stderr
+
     def test_fetch_copy_file_failure(self, runner, mock_rules_path, temp_dir):
         """Test fetch when copy_rule_file fails."""
         with patch("cursor_dev_rules.cli.get_rules_path", return_value=mock_rules_path):
@@ -281,6 +368,63 @@ class TestFetchCommand:
 
                     assert result.exit_code != 0
 
+    @pytest.mark.parametrize("failing_dir", ["general", "code-patterns"])
+    def test_fetch_partial_copy_failure(
+        self, runner, mock_rules_path, temp_dir, failing_dir
+    ):
+        """Test a failed copy leaves the installed rules untouched."""
+
+        def copy_unless_failing(source, dest, console, **kwargs):
+            if dest.parent.name == failing_dir:
+                return False
+            return copy_rule_file(source, dest, console, **kwargs)
+
+        with patch("cursor_dev_rules.cli.get_rules_path", return_value=mock_rules_path):
+            with patch(
+                "cursor_dev_rules.cli.copy_rule_file", side_effect=copy_unless_failing
+            ):
+                with runner.isolated_filesystem(temp_dir):
+                    general = Path(".cursor/rules/general/RULE.md")
+                    specific = Path(".cursor/rules/code-patterns/RULE.md")
+                    general.parent.mkdir(parents=True)
+                    general.write_text("# Old General")
+                    specific.parent.mkdir(parents=True)
+                    specific.write_text("# Old Specific")
+
+                    result = runner.invoke(main, ["fetch", "backend/django"])
+
+                    assert result.exit_code != 0
+                    assert "Successfully installed rules" not in result.output
+                    assert general.read_text() == "# Old General"
+                    assert specific.read_text() == "# Old Specific"
+                    assert sorted(p.name for p in general.parent.iterdir()) == [
+                        "RULE.md"
+                    ]
+                    assert sorted(p.name for p in specific.parent.iterdir()) == [
+                        "RULE.md"
+                    ]
+
+    def test_fetch_copy_failure_installs_nothing(
+        self, runner, mock_rules_path, temp_dir
+    ):
+        """Test a failed copy does not install the other rule on a fresh project."""
+
+        def copy_framework_only(source, dest, console, **kwargs):
+            if dest.parent.name == "general":
+                return False
+            return copy_rule_file(source, dest, console, **kwargs)
+
+        with patch("cursor_dev_rules.cli.get_rules_path", return_value=mock_rules_path):
+            with patch(
+                "cursor_dev_rules.cli.copy_rule_file", side_effect=copy_framework_only
+            ):
+                with runner.isolated_filesystem(temp_dir):
+                    result = runner.invoke(main, ["fetch", "backend/django"])
+
+                    assert result.exit_code != 0
+                    assert not Path(".cursor/rules/code-patterns/RULE.md").exists()
+                    assert list(Path(".cursor/rules").rglob("*.*")) == []
+
     def test_fetch_unexpected_exception(self, runner, temp_dir):
         """Test fetch handles unexpected exceptions."""
         with patch(
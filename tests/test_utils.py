@@ -1,290 +1,359 @@
 """Tests for utility functions in cursor_dev_rules.cli."""
 
+import hashlib
+import io
+import sys
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
-from rich.console import Console
+from pyfakefs.helpers import set_uid
 
+import cursor_dev_rules.cli
 from cursor_dev_rules.cli import copy_rule_file, get_rules_path
 
+# Keep each group of tests on one pytest-xdist worker (--dist=loadgroup)
+rules_group = pytest.mark.xdist_group("utils_rules")
+copy_group = pytest.mark.xdist_group("utils_copy")
 
-class TestGetRulesPath:
-    """Tests for get_rules_path() function."""
-
-    @patch("importlib.resources.files")
-    def test_get_rules_path_with_installed_package(self, mock_files, mock_traversable):
-        """Test get_rules_path() when package is installed."""
-        # Mock the installed package structure
-        # Note: Since importlib.resources is imported inside the function,
-        # we test the installed package path by ensuring the mock returns a valid structure
-        mock_package = MagicMock()
-        mock_rules = MagicMock()
-        mock_rules.is_dir.return_value = True
-
-        mock_package.__truediv__ = lambda x: mock_rules if x == "rules" else MagicMock()
-        mock_files.return_value = mock_package
-
-        # The function imports importlib.resources inside, so we need to patch it
-        # at the module level where it's used. Since this is complex, we'll test
-        # that the function works in dev mode (which is the common case) and
-        # that it handles the installed package case gracefully.
-        # For a full test, we'd need to actually install the package.
-        result = get_rules_path()
-
-        # In practice, this will fall back to dev mode since importlib.resources
-        # is imported inside the function. This test verifies the fallback works.
-        assert isinstance(result, Path)
-        assert result.exists()
-
-    @patch("importlib.resources.files")
-    def test_get_rules_path_fallback_to_dev_mode(self, mock_files, temp_dir):
-        """Test get_rules_path() falls back to development mode."""
-        # Mock importlib.resources to raise an exception
-        mock_files.side_effect = ModuleNotFoundError("Package not found")
-
-        # Create a rules directory in a temporary project structure
-        project_root = temp_dir / "project"
-        project_root.mkdir()
-        package_dir = project_root / "cursor_dev_rules"
-        package_dir.mkdir()
-        rules_dir = package_dir / "rules"
-        rules_dir.mkdir()
-
-        # Patch __file__ to point to our test structure
-        import cursor_dev_rules.cli
-
-        original_file = cursor_dev_rules.cli.__file__
-        cursor_dev_rules.cli.__file__ = str(package_dir / "cli.py")
-
-        try:
-            result = get_rules_path()
-            assert isinstance(result, Path)
-            assert result == rules_dir
-        finally:
-            cursor_dev_rules.cli.__file__ = original_file
-
-    @patch("importlib.resources.files")
-    def test_get_rules_path_not_a_directory(self, mock_files):
-        """Test get_rules_path() when rules is not a directory."""
-        mock_package = MagicMock()
-        mock_rules = MagicMock()
-        # Check both is_dir() methods
-        if hasattr(mock_rules, "is_dir"):
-            mock_rules.is_dir.return_value = False
-        # Also check if it's a Path instance
-        if isinstance(mock_rules, Path):
-            mock_rules.exists.return_value = False
-            mock_rules.is_dir.return_value = False
-
-        mock_package.__truediv__ = lambda x: mock_rules if x == "rules" else MagicMock()
-        mock_files.return_value = mock_package
-
-        # Should fall back to development mode (package directory first, then project root)
-        result = get_rules_path()
-
-        # Should return the development rules path
-        assert isinstance(result, Path)
-        assert result.exists()
-
-    @patch("importlib.resources.files")
-    def test_get_rules_path_file_not_found(self, mock_files, temp_dir):
-        """Test get_rules_path() raises FileNotFoundError when rules don't exist."""
-        # Mock importlib.resources to raise an exception
-        mock_files.side_effect = ModuleNotFoundError("Package not found")
-
-        # Create a project structure without rules directory
-        project_root = temp_dir / "project"
-        project_root.mkdir()
-        package_dir = project_root / "cursor_dev_rules"
-        package_dir.mkdir()
-        # Don't create rules directory
-
-        # Patch __file__ to point to our test structure (without rules)
-        import cursor_dev_rules.cli
-
-        original_file = cursor_dev_rules.cli.__file__
-        cursor_dev_rules.cli.__file__ = str(package_dir / "cli.py")
-
-        try:
-            with pytest.raises(
-                FileNotFoundError, match="Could not find rules directory"
-            ):
-                get_rules_path()
-        finally:
-            cursor_dev_rules.cli.__file__ = original_file
-
-    @patch("importlib.resources.files")
-    def test_get_rules_path_attribute_error(self, mock_files, temp_dir):
-        """Test get_rules_path() handles AttributeError from importlib.resources."""
-        mock_files.side_effect = AttributeError("Attribute not found")
-
-        result = get_rules_path()
-
-        # Should fall back to development mode
-        assert isinstance(result, Path)
-        assert result.exists()
-
-    @patch("importlib.resources.files")
-    def test_get_rules_path_type_error(self, mock_files, temp_dir):
-        """Test get_rules_path() handles TypeError from importlib.resources."""
-        mock_files.side_effect = TypeError("Type error")
-        result = get_rules_path()
-
-        # Should fall back to development mode
-        assert isinstance(result, Path)
-        assert result.exists()
-
-
-class TestCopyRuleFile:
-    """Tests for copy_rule_file() function."""
-
-    def test_copy_rule_file_with_traversable(self, temp_dir, mock_traversable):
-        """Test copy_rule_file() with a Traversable source."""
-        dest = temp_dir / "output" / "RULE.md"
-        console = Console()
-
-        result = copy_rule_file(mock_traversable, dest, console)
-
-        assert result is True
-        assert dest.exists()
-        assert dest.read_bytes() == b"# Mock Rule Content"
-        mock_traversable.read_bytes.assert_called_once()
-
-    def test_copy_rule_file_with_path(self, temp_dir):
-        """Test copy_rule_file() with a Path source."""
-        source = temp_dir / "source" / "RULE.md"
-        source.parent.mkdir(parents=True)
-        source.write_text("# Test Rule Content")
-
-        dest = temp_dir / "output" / "RULE.md"
-        console = Console()
-
-        result = copy_rule_file(source, dest, console)
-
-        assert result is True
-        assert dest.exists()
-        assert dest.read_text() == "# Test Rule Content"
-
-    def test_copy_rule_file_creates_parent_directories(self, temp_dir):
-        """Test copy_rule_file() creates parent directories if they don't exist."""
-        source = temp_dir / "source" / "RULE.md"
-        source.parent.mkdir(parents=True)
-        source.write_text("# Test Rule")
+RULE_SOURCE_BYTES = (
+    b"# Test Rule\n\nThis is a test rule file.\n\n## Section\n\nContent here."
+)
 
-        dest = temp_dir / "nested" / "deep" / "path" / "RULE.md"
-        console = Console()
 
-        result = copy_rule_file(source, dest, console)
+def same_content(a, b):
+    """Check whether two files have the same content by comparing digests."""
 
-        assert result is True
-        assert dest.parent.exists()
-        assert dest.exists()
+    def digest(path):
+        return hashlib.blake2b(path.read_bytes(), digest_size=16).digest()
 
-    def test_copy_rule_file_with_existing_directory(self, temp_dir):
-        """Test copy_rule_file() works when parent directory already exists."""
-        source = temp_dir / "source" / "RULE.md"
-        source.parent.mkdir(parents=True)
-        source.write_text("# Test Rule")
+    return digest(a) == digest(b)
 
-        dest_dir = temp_dir / "output"
-        dest_dir.mkdir(parents=True)
-        dest = dest_dir / "RULE.md"
-        console = Console()
 
-        result = copy_rule_file(source, dest, console)
+class RaisingSource:
+    """Rule source whose open() raises the given exception."""
 
-        assert result is True
-        assert dest.exists()
+    __slots__ = ("_exc",)
 
-    def test_copy_rule_file_with_read_bytes_method(self, temp_dir):
-        """Test copy_rule_file() with an object that has read_bytes method."""
+    def __init__(self, exc):
+        self._exc = exc
 
-        class MockSource:
-            def read_bytes(self):
-                return b"# Mock Content"
+    def open(self, mode="r"):
+        raise self._exc
 
-        source = MockSource()
-        dest = temp_dir / "output" / "RULE.md"
-        console = Console()
 
-        result = copy_rule_file(source, dest, console)
+@pytest.fixture(scope="module")
+def dev_rules_path():
+    """Path of the rules directory bundled in the source tree."""
+    return Path(cursor_dev_rules.cli.__file__).parent / "rules"
 
-        assert result is True
-        assert dest.exists()
-        assert dest.read_bytes() == b"# Mock Content"
 
-    def test_copy_rule_file_handles_permission_error(self, temp_dir):
-        """Test copy_rule_file() handles permission errors gracefully."""
-        source = temp_dir / "source" / "RULE.md"
-        source.parent.mkdir(parents=True)
-        source.write_text("# Test Rule")
+class FakeRules:
+    """Minimal stand-in for the rules Traversable from importlib.resources."""
 
-        # Create a destination in a non-writable location (simulated)
-        dest = Path("/root/non-writable/RULE.md")
-        console = Console()
+    __slots__ = ("_is_dir",)
 
-        # Mock the write_bytes to raise PermissionError
-        with patch.object(
-            Path, "write_bytes", side_effect=PermissionError("Permission denied")
-        ):
-            result = copy_rule_file(source, dest, console)
+    def __init__(self, is_dir):
+        self._is_dir = is_dir
 
-        assert result is False
+    def is_dir(self):
+        return self._is_dir
 
-    def test_copy_rule_file_handles_io_error(self, temp_dir):
-        """Test copy_rule_file() handles IO errors gracefully."""
-        source = temp_dir / "source" / "RULE.md"
-        source.parent.mkdir(parents=True)
-        source.write_text("# Test Rule")
 
-        dest = temp_dir / "output" / "RULE.md"
-        console = Console()
+class FakePackage:
+    """Minimal stand-in for the package Traversable from importlib.resources."""
 
-        # Mock write_bytes to raise IOError
-        with patch.object(Path, "write_bytes", side_effect=IOError("Disk full")):
-            result = copy_rule_file(source, dest, console)
+    __slots__ = ("rules",)
 
-        assert result is False
+    def __init__(self, rules):
+        self.rules = rules
 
-    def test_copy_rule_file_handles_missing_source(self, temp_dir):
-        """Test copy_rule_file() handles missing source file."""
-        source = temp_dir / "nonexistent" / "RULE.md"
-        dest = temp_dir / "output" / "RULE.md"
-        console = Console()
+    def __truediv__(self, name):
+        return self.rules if name == "rules" else FakeRules(is_dir=False)
 
-        # Using Path source that doesn't exist - shutil.copy2 will raise FileNotFoundError
-        result = copy_rule_file(source, dest, console)
 
-        assert result is False
+# Tests for get_rules_path()
 
-    def test_copy_rule_file_preserves_file_content(self, temp_dir):
-        """Test copy_rule_file() preserves exact file content."""
-        original_content = (
-            b"# Test Rule\n\nThis is a test rule file.\n\n## Section\n\nContent here."
-        )
-        source = temp_dir / "source" / "RULE.md"
-        source.parent.mkdir(parents=True)
-        source.write_bytes(original_content)
 
-        dest = temp_dir / "output" / "RULE.md"
-        console = Console()
+@pytest.fixture
+def mocked_project(temp_dir, monkeypatch):
+    """Point cursor_dev_rules.cli at an empty temporary project structure."""
+    package_dir = temp_dir / "project" / "cursor_dev_rules"
+    package_dir.mkdir(parents=True)
+    monkeypatch.setattr(cursor_dev_rules.cli, "__file__", str(package_dir / "cli.py"))
+    return package_dir
 
-        result = copy_rule_file(source, dest, console)
 
-        assert result is True
-        assert dest.read_bytes() == original_content
+@rules_group
+def test_get_rules_path_with_installed_package(mock_package_resources):
+    """Test get_rules_path() returns the rules of the installed package."""
+    assert get_rules_path() == mock_package_resources
 
-    def test_copy_rule_file_with_special_characters_in_path(self, temp_dir):
-        """Test copy_rule_file() handles special characters in path."""
-        source = temp_dir / "source" / "RULE.md"
-        source.parent.mkdir(parents=True)
-        source.write_text("# Test Rule")
 
-        dest = temp_dir / "output with spaces" / "sub-dir" / "RULE.md"
-        console = Console()
+@rules_group
+@pytest.mark.parametrize(
+    "exc",
+    [
+        ModuleNotFoundError("Package not found"),
+        AttributeError("Attribute not found"),
+        TypeError("Type error"),
+        RuntimeError("Unexpected error"),
+    ],
+    ids=lambda exc: type(exc).__name__,
+)
+@patch("cursor_dev_rules.cli.resources.files")
+def test_get_rules_path_fallback_to_dev_mode(mock_files, mocked_project, exc):
+    """Test get_rules_path() falls back to development mode on lookup errors."""
+    mock_files.side_effect = exc
+    rules_dir = mocked_project / "rules"
+    rules_dir.mkdir()
 
-        result = copy_rule_file(source, dest, console)
+    assert get_rules_path() == rules_dir
 
-        assert result is True
-        assert dest.exists()
+
+@rules_group
+@patch("cursor_dev_rules.cli.resources.files")
+def test_get_rules_path_fallback_to_project_root(mock_files, mocked_project):
+    """Test get_rules_path() falls back to the project root rules directory."""
+    mock_files.side_effect = ModuleNotFoundError("Package not found")
+    rules_dir = mocked_project.parent / "rules"
+    rules_dir.mkdir()
+
+    assert get_rules_path() == rules_dir
+
+
+@rules_group
+@patch("cursor_dev_rules.cli.resources.files")
+def test_get_rules_path_not_a_directory(mock_files, dev_rules_path):
+    """Test get_rules_path() when rules is not a directory."""
+    mock_files.return_value = FakePackage(FakeRules(is_dir=False))
+
+    # Should fall back to the development rules path in the package directory
+    assert get_rules_path() == dev_rules_path
+
+
+@rules_group
+@patch("cursor_dev_rules.cli.resources.files")
+def test_get_rules_path_file_not_found(mock_files, mocked_project):
+    """Test get_rules_path() raises FileNotFoundError when rules don't exist."""
+    mock_files.side_effect = ModuleNotFoundError("Package not found")
+
+    with pytest.raises(FileNotFoundError, match="Could not find rules directory"):
+        get_rules_path()
+
+
+@rules_group
+@patch("cursor_dev_rules.cli.resources.files")
+def test_get_rules_path_is_cached(mock_files):
+    """Test get_rules_path() only resolves the rules directory once."""
+    mock_files.side_effect = ModuleNotFoundError("Package not found")
+
+    first = get_rules_path()
+    second = get_rules_path()
+
+    assert first is second
+    mock_files.assert_called_once()
+
+
+# Tests for copy_rule_file()
+
+
+@pytest.fixture
+def fake_dir(fs):
+    """Create a directory on pyfakefs's in-memory filesystem."""
+    return Path("/fake")
+
+
+@pytest.fixture
+def rule_source(fake_dir):
+    """Create a source rule file."""
+    source = fake_dir / "source" / "RULE.md"
+    source.parent.mkdir(parents=True)
+    source.write_text("# Test Rule")
+    return source
+
+
+@pytest.fixture
+def rule_source_bytes(fake_dir):
+    """Create a multi-line source rule file with RULE_SOURCE_BYTES content."""
+    source = fake_dir / "source" / "RULE.md"
+    source.parent.mkdir(parents=True)
+    source.write_bytes(RULE_SOURCE_BYTES)
+    return source
+
+
+@copy_group
+def test_copy_rule_file_with_traversable(fake_dir, mock_traversable, console):
+    """Test copy_rule_file() with a Traversable source."""
+    dest = fake_dir / "output" / "RULE.md"
+
+    result = copy_rule_file(mock_traversable, dest, console)
+
+    assert result is True
+    assert dest.exists()
+    assert dest.read_bytes() == b"# Mock Rule Content"
+    mock_traversable.open.assert_called_once_with("rb")
+
+
+@copy_group
+def test_copy_rule_file_with_path(fake_dir, rule_source, console):
+    """Test copy_rule_file() with a Path source."""
+    dest = fake_dir / "output" / "RULE.md"
+
+    result = copy_rule_file(rule_source, dest, console)
+
+    assert result is True
+    assert same_content(rule_source, dest)
+
+
+@copy_group
+def test_copy_rule_file_with_str_path(fake_dir, rule_source, console):
+    """Test copy_rule_file() falls back to a plain copy for str sources."""
+    dest = fake_dir / "output" / "RULE.md"
+
+    result = copy_rule_file(str(rule_source), dest, console)
+
+    assert result is True
+    assert same_content(rule_source, dest)
+
+
+@copy_group
+def test_copy_rule_file_creates_parent_directories(fake_dir, rule_source, console):
+    """Test copy_rule_file() creates parent directories if they don't exist."""
+    dest = fake_dir / "nested" / "deep" / "path" / "RULE.md"
+
+    result = copy_rule_file(rule_source, dest, console)
+
+    assert result is True
+    assert dest.parent.exists()
+    assert dest.exists()
+
+
+@copy_group
+def test_copy_rule_file_without_make_parents(fake_dir, rule_source, console):
+    """Test copy_rule_file() doesn't create parents when make_parents=False."""
+    dest = fake_dir / "missing" / "RULE.md"
+
+    result = copy_rule_file(rule_source, dest, console, make_parents=False)
+
+    assert result is False
+    assert not dest.parent.exists()
+
+
+@copy_group
+def test_copy_rule_file_with_existing_directory(fake_dir, rule_source, console):
+    """Test copy_rule_file() works when parent directory already exists."""
+    dest_dir = fake_dir / "output"
+    dest_dir.mkdir(parents=True)
+    dest = dest_dir / "RULE.md"
+
+    result = copy_rule_file(rule_source, dest, console)
+
+    assert result is True
+    assert dest.exists()
+
+
+@copy_group
+def test_copy_rule_file_with_open_method(fake_dir, console):
+    """Test copy_rule_file() with an object that has an open method."""
+
+    class MockSource:
+        def open(self, mode="r"):
+            return io.BytesIO(b"# Mock Content")
+
+    source = MockSource()
+    dest = fake_dir / "output" / "RULE.md"
+
+    result = copy_rule_file(source, dest, console)
+
+    assert result is True
+    assert dest.exists()
+    assert dest.read_bytes() == b"# Mock Content"
+
+
+@copy_group
+@pytest.mark.skipif(
+    sys.platform == "win32",
+    reason="pyfakefs ignores directory write permissions on Windows",
+)
+def test_copy_rule_file_handles_permission_error(fake_dir, rule_source, fs, console):
+    """Test copy_rule_file() handles permission errors gracefully."""
+    # Create a destination in a non-writable location
+    dest = Path("/root/non-writable/RULE.md")
+    fs.create_dir(dest.parent)
+    fs.chmod(dest.parent, 0o555)
+    # pyfakefs ignores permissions for root, so act as a regular user
+    set_uid(1000)
+
+    result = copy_rule_file(rule_source, dest, console)
+
+    assert result is False
+    assert not dest.exists()
+
+
+@copy_group
+def test_copy_rule_file_handles_io_error(fake_dir, console):
+    """Test copy_rule_file() handles IO errors gracefully."""
+    dest = fake_dir / "output" / "RULE.md"
+
+    result = copy_rule_file(RaisingSource(IOError("Disk full")), dest, console)
+
+    assert result is False
+    assert not dest.exists()
+
+
+@copy_group
+def test_copy_rule_file_failure_keeps_existing_dest(fake_dir, console):
+    """Test a failed copy leaves the existing dest and no temp file behind."""
+
+    class FailingStream(io.BytesIO):
+        def read(self, *args):
+            raise IOError("Read failed")
+
+    class MockSource:
+        def open(self, mode="r"):
+            return FailingStream()
+
+    dest = fake_dir / "output" / "RULE.md"
+    dest.parent.mkdir(parents=True)
+    dest.write_text("# Old Rule")
+
+    result = copy_rule_file(MockSource(), dest, console)
+
+    assert result is False
+    assert dest.read_text() == "# Old Rule"
+    assert list(dest.parent.iterdir()) == [dest]
+
+
+@copy_group
+def test_copy_rule_file_handles_missing_source(fake_dir, console):
+    """Test copy_rule_file() handles missing source file."""
+    source = fake_dir / "nonexistent" / "RULE.md"
+    dest = fake_dir / "output" / "RULE.md"
+
+    # Using Path source that doesn't exist - shutil.copy2 will raise FileNotFoundError
+    result = copy_rule_file(source, dest, console)
+
+    assert result is False
+
+
+@copy_group
+def test_copy_rule_file_preserves_file_content(fake_dir, rule_source_bytes, console):
+    """Test copy_rule_file() preserves exact file content."""
+    dest = fake_dir / "output" / "RULE.md"
+
+    result = copy_rule_file(rule_source_bytes, dest, console)
+
+    assert result is True
+    assert same_content(rule_source_bytes, dest)
+
+
+@copy_group
+def test_copy_rule_file_with_special_characters_in_path(fake_dir, rule_source, console):
+    """Test copy_rule_file() handles special characters in path."""
+    dest = fake_dir / "output with spaces" / "sub-dir" / "RULE.md"
+
+    result = copy_rule_file(rule_source, dest, console)
+
+    assert result is True
+    assert dest.exists()